@@ -22,6 +22,15 @@ from glob import iglob
 
 import pytest
 import yaml
+from click.testing import CliRunner
+from jenkins_jobs.cli.entry import JenkinsJobs
+
+from jenkins_job_linter import main
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # libyaml bindings unavailable
+    from yaml import SafeLoader
 
 
 def get_available_port():
@@ -130,16 +139,18 @@ class DirectRunner(IntegrationTestRunner):
 
     def run_test(self, tmpdir, config):
         output_dir = os.path.join(tmpdir, 'output')
-        subprocess.check_call([
-            'jenkins-jobs', 'test', os.path.join(tmpdir), '-o', output_dir])
+        JenkinsJobs(['test', str(tmpdir), '-o', output_dir]).execute()
         config_args = []
         if config is not None:
             conf_file = tmpdir.join('config.ini')
             conf_file.write(config)
             config_args = ['--conf', str(conf_file)]
-        return self.run_test_command(
-            ['jenkins-job-linter'] + config_args + ['lint-directory',
-                                                    output_dir])
+        # Lint in-process rather than paying for a fresh interpreter per test
+        result = CliRunner().invoke(
+            main, config_args + ['lint-directory', output_dir])
+        if not isinstance(result.exception, (type(None), SystemExit)):
+            raise result.exception
+        return result.exit_code == 0, result.output
 
 
 class JJBSubcommandRunner(IntegrationTestRunner):
@@ -207,11 +218,28 @@ def _parse_case(case_dict, defaults):
     )
 
 
-def _parse_testcases(filenames):
+def _load_testcase_file(filename, cache=None):
+    # Parsed data is kept in the pytest cache between sessions, and is
+    # invalidated whenever the file's modification time or size changes
+    stat = os.stat(filename)
+    fingerprint = [stat.st_mtime_ns, stat.st_size]
+    cache_key = 'jenkins_job_linter/testcases/{}'.format(
+        os.path.basename(filename))
+    if cache is not None:
+        cached = cache.get(cache_key, None)
+        if cached is not None and cached['fingerprint'] == fingerprint:
+            return cached['data']
+    with open(filename, 'rb') as f:
+        data = yaml.load(f.read(), Loader=SafeLoader)
+    if cache is not None:
+        cache.set(cache_key, {'fingerprint': fingerprint, 'data': data})
+    return data
+
+
+def _parse_testcases(filenames, cache=None):
     names = set()
     for filename in filenames:
-        with open(filename) as f:
-            data = yaml.safe_load(f)
+        data = _load_testcase_file(filename, cache)
         defaults = data.get('defaults', {})
         for case_dict in data['cases']:
             testcase = _parse_case(case_dict, defaults)
@@ -224,7 +252,9 @@ def _parse_testcases(filenames):
 
 def pytest_generate_tests(metafunc):
     test_dir = os.path.dirname(inspect.getfile(inspect.currentframe()))
-    test_cases = _parse_testcases(iglob(os.path.join(test_dir, 'test_*.yaml')))
+    test_cases = _parse_testcases(
+        iglob(os.path.join(test_dir, 'test_*.yaml')),
+        getattr(metafunc.config, 'cache', None))
     if 'integration_testcase' in metafunc.fixturenames:
         metafunc.parametrize('integration_testcase', test_cases,
                              ids=lambda testcase: testcase.test_name)
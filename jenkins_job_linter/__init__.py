@@ -13,38 +13,210 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Run a series of checks against compiled job XML."""
+import contextlib
+import io
 import os
 import sys
-from configparser import ConfigParser
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from configparser import ConfigParser, SectionProxy
+from itertools import repeat
+from typing import (  # noqa
+    Any,
+    Callable,
+    cast,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
 from xml.etree import ElementTree
 
 import click
 import jenkins
 
-from jenkins_job_linter.config import _filter_config, GetListConfigParser
-from jenkins_job_linter.linters import LINTERS
+from jenkins_job_linter.cache import get_run_fingerprint, LintCache
+from jenkins_job_linter.config import (
+    _filter_config,
+    CachedSectionProxy,
+    ConfigError,
+    GetListConfigParser,
+)
+from jenkins_job_linter.linters import Linter, LINTERS
 from jenkins_job_linter.models import LintContext, RunContext
 
 
+EnabledLinters = List[Tuple[Type[Linter], SectionProxy]]
+
+# The number of job configs fetched from Jenkins concurrently; enough to hide
+# request latency without hammering the server (ThreadPoolExecutor's own
+# default scales with the number of local CPUs, which is irrelevant here)
+JENKINS_FETCH_WORKERS = 16
+
+
+def _get_enabled_linters(config: GetListConfigParser) -> EnabledLinters:
+    """
+    Return the linters that config enables, with their config sections.
+
+    The sections are CachedSectionProxy instances, so each linter option is
+    only resolved once per run however many jobs are checked.
+    """
+    disabled = frozenset(config.getlist('job_linter', 'disable_linters'))
+    only_run = frozenset(config.getlist('job_linter', 'only_run'))
+    return [(linter,
+             CachedSectionProxy(config, 'job_linter:{}'.format(linter_name)))
+            for linter_name, linter in LINTERS.items()
+            if linter_name not in disabled
+            and (not only_run or linter_name in only_run)]
+
+
 def lint_job_xml(ctx: RunContext, job_name: str, tree: ElementTree.ElementTree,
-                 config: GetListConfigParser) -> bool:
-    """Run all the linters against an XML tree."""
+                 config: GetListConfigParser,
+                 enabled_linters: Optional[EnabledLinters] = None) -> bool:
+    """
+    Run all the linters against an XML tree.
+
+    :param enabled_linters:
+        The result of _get_enabled_linters(config); callers linting many jobs
+        pass this in so that it is only computed once per run.
+    """
+    if enabled_linters is None:
+        enabled_linters = _get_enabled_linters(config)
     success = True
-    for linter_name, linter in LINTERS.items():
-        if linter_name in config.getlist('job_linter', 'disable_linters'):
-            continue
-        only_run = config.getlist('job_linter', 'only_run')
-        if only_run and linter_name not in only_run:
-            continue
-        section = config['job_linter:{}'.format(linter_name)]
+    failures = []  # type: List[str]
+    for linter, section in enabled_linters:
         result, text = linter(LintContext(section, ctx, tree)).check()
         if not result.value:
             success = False
-            output = '{}: {}: FAIL'.format(job_name, linter.description)
-            if text is not None:
-                output += ': {}'.format(text)
-            print(output)
+            template = ('{}: {}: FAIL' if text is None
+                        else '{}: {}: FAIL: {}')
+            failures.append(
+                template.format(job_name, linter.description, text))
+    if failures:
+        print('\n'.join(failures))
+    return success
+
+
+JobResult = Tuple[bool, str]
+
+
+def _lint_job_file(ctx: RunContext, config: GetListConfigParser,
+                   enabled_linters: EnabledLinters, job_name: str,
+                   job_path: str) -> JobResult:
+    """
+    Parse and lint a single job file, capturing its output.
+
+    This is run in worker processes, so the output is returned for the parent
+    to emit rather than being printed directly.
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = lint_job_xml(ctx, job_name, ElementTree.parse(job_path),
+                              config, enabled_linters=enabled_linters)
+    return result, output.getvalue()
+
+
+def _lint_job_bytes(ctx: RunContext, config: GetListConfigParser,
+                    enabled_linters: EnabledLinters, job_name: str,
+                    job_xml: bytes) -> JobResult:
+    """Parse and lint a single job's XML, capturing its output."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = lint_job_xml(
+            ctx, job_name,
+            ElementTree.ElementTree(ElementTree.fromstring(job_xml)), config,
+            enabled_linters=enabled_linters)
+    return result, output.getvalue()
+
+
+def _map_jobs(processes: int, func: Callable[..., JobResult],
+              shared_args: Sequence[Any], job_names: Sequence[str],
+              job_sources: Sequence[Any]) -> Iterator[JobResult]:
+    """
+    Call func(*shared_args, job_name, job_source) for each job, in order.
+
+    If processes is not 1, the calls are spread over a process pool.
+    """
+    per_job_args = [repeat(arg) for arg in shared_args]
+    if processes == 1:
+        yield from map(func, *per_job_args, job_names, job_sources)
+    else:
+        workers = processes or os.cpu_count() or 1
+        # Batch jobs so that each worker gets a few chunks; this amortises the
+        # IPC overhead and means the shared arguments are pickled once per
+        # chunk
+        chunksize = max(1, len(job_names) // (4 * workers))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(func, *per_job_args, job_names,
+                                    job_sources, chunksize=chunksize)
+
+
+def _get_processes(config: GetListConfigParser) -> int:
+    """
+    Return the configured number of lint processes.
+
+    This raises ConfigError if it isn't a non-negative integer.
+    """
+    processes = config.get('job_linter', 'processes')
+    try:
+        value = int(processes)
+    except (TypeError, ValueError):
+        value = -1
+    if value < 0:
+        raise ConfigError(
+            'job_linter.processes must be a non-negative integer, not'
+            ' {!r}'.format(processes))
+    return value
+
+
+def _get_cache(config: GetListConfigParser, enabled_linters: EnabledLinters,
+               object_names: Sequence[str]) -> Optional[LintCache]:
+    """Return the LintCache for this run, or None if it isn't configured."""
+    cache_file = config.get('job_linter', 'cache_file')
+    if not cache_file:
+        return None
+    return LintCache(cache_file, get_run_fingerprint(
+        config, [linter for linter, _ in enabled_linters], object_names))
+
+
+def _lint_jobs_with_cache(cache: LintCache, run_ctx: RunContext,
+                          config: GetListConfigParser,
+                          enabled_linters: EnabledLinters,
+                          job_names: Sequence[str],
+                          job_xmls: Sequence[bytes],
+                          processes: int) -> bool:
+    """
+    Lint jobs' raw XML, reusing cached results for any that are unchanged.
+
+    The cache is checked before anything is parsed, so cached jobs are never
+    parsed at all.  Jobs that aren't in the cache are linted (in a pool of
+    processes, unless processes is 1), and their results are added to the
+    cache, which is then saved (with a warning, rather than an error, if that
+    fails).  Output is emitted in job order regardless.
+    """
+    results = [cache.get(job_name, job_xml)
+               for job_name, job_xml in zip(job_names, job_xmls)]
+    misses = [index for index, result in enumerate(results) if result is None]
+    fresh_results = _map_jobs(
+        processes, _lint_job_bytes, (run_ctx, config, enabled_linters),
+        [job_names[index] for index in misses],
+        [job_xmls[index] for index in misses])
+    for index, (result, output) in zip(misses, fresh_results):
+        cache.set(job_names[index], job_xmls[index], result, output)
+        results[index] = (result, output)
+    try:
+        cache.save()
+    except OSError as exc:
+        # A cache that can't be written shouldn't cost the user their results
+        print('WARNING: could not save lint cache to {}: {}'.format(
+            cache.path, exc), file=sys.stderr)
+    success = True
+    for cached_result in results:
+        # Every miss has been filled in by the loop above
+        result, output = cast(JobResult, cached_result)
+        sys.stdout.write(output)
+        success = success and result
     return success
 
 
@@ -53,11 +225,33 @@ def lint_jobs_from_directory(compiled_job_directory: str,
     """Load jobs from a directory and run linters against each one."""
     config = _filter_config(config)
     success = True
-    filenames = os.listdir(compiled_job_directory)
-    for job_file in filenames:
-        job_path = os.path.join(compiled_job_directory, job_file)
-        result = lint_job_xml(RunContext(filenames), job_file,
-                              ElementTree.parse(job_path), config)
+    job_files = [entry for entry in os.scandir(compiled_job_directory)
+                 if entry.is_file()]
+    filenames = [job_file.name for job_file in job_files]
+    run_ctx = RunContext(filenames)
+    enabled_linters = _get_enabled_linters(config)
+    cache = _get_cache(config, enabled_linters, filenames)
+    processes = _get_processes(config)
+    if cache is not None:
+        job_xmls = []  # type: List[bytes]
+        for job_file in job_files:
+            with open(job_file.path, 'rb') as job_xml_file:
+                job_xmls.append(job_xml_file.read())
+        return _lint_jobs_with_cache(cache, run_ctx, config, enabled_linters,
+                                     filenames, job_xmls, processes)
+    if processes == 1:
+        for job_file in job_files:
+            result = lint_job_xml(run_ctx, job_file.name,
+                                  ElementTree.parse(job_file.path), config,
+                                  enabled_linters=enabled_linters)
+            success = success and result
+        return success
+    job_paths = [job_file.path for job_file in job_files]
+    results = _map_jobs(processes, _lint_job_file,
+                        (run_ctx, config, enabled_linters),
+                        filenames, job_paths)
+    for result, output in results:
+        sys.stdout.write(output)
         success = success and result
     return success
 
@@ -71,12 +265,24 @@ def lint_jobs_from_running_jenkins(jenkins_url: str, jenkins_username: str,
         jenkins_url, username=jenkins_username, password=jenkins_password)
     success = True
     job_names = [j['name'] for j in server.get_jobs()]
-    for job_name in job_names:
-        job_xml = server.get_job_config(job_name)
-        element_tree = ElementTree.ElementTree(ElementTree.fromstring(job_xml))
-        result = lint_job_xml(RunContext(job_names), job_name,
-                              element_tree, config)
-        success = success and result
+    run_ctx = RunContext(job_names)
+    enabled_linters = _get_enabled_linters(config)
+    cache = _get_cache(config, enabled_linters, job_names)
+    # Fetching job configuration is network-bound, so do it concurrently
+    with ThreadPoolExecutor(max_workers=JENKINS_FETCH_WORKERS) as executor:
+        job_xmls = executor.map(server.get_job_config, job_names)
+        if cache is not None:
+            return _lint_jobs_with_cache(
+                cache, run_ctx, config, enabled_linters, job_names,
+                [job_xml.encode('utf-8') for job_xml in job_xmls],
+                # processes only applies to compiled job directories
+                processes=1)
+        for job_name, job_xml in zip(job_names, job_xmls):
+            element_tree = ElementTree.ElementTree(
+                ElementTree.fromstring(job_xml))
+            result = lint_job_xml(run_ctx, job_name, element_tree, config,
+                                  enabled_linters=enabled_linters)
+            success = success and result
     return success
 
 
@@ -97,7 +303,10 @@ def main(ctx: click.Context, conf: Optional[str] = None) -> None:
 @click.pass_context
 def lint_directory(ctx: click.Context, compiled_job_directory: str) -> None:
     """Take a directory of Jenkins job XML and run some checks against it."""
-    result = lint_jobs_from_directory(compiled_job_directory, ctx.obj)
+    try:
+        result = lint_jobs_from_directory(compiled_job_directory, ctx.obj)
+    except ConfigError as exc:
+        raise click.ClickException(str(exc))
     if not result:
         sys.exit(1)
     sys.exit(0)
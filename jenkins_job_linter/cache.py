@@ -0,0 +1,173 @@
+# Copyright (C) 2017  Daniel Watkins <daniel@daniel-watkins.co.uk>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Persist lint results between runs, keyed on job content."""
+import hashlib
+import json
+import os
+import tempfile
+from configparser import ConfigParser
+from typing import Any, Dict, Iterable, Optional, Tuple, Type  # noqa
+
+from jenkins_job_linter.linters import Linter
+
+CachedResult = Tuple[bool, str]
+
+# job_linter options that affect how a run is carried out, but not what any
+# job's lint result is
+_UNFINGERPRINTED_OPTIONS = frozenset(['cache_file', 'processes'])
+
+
+def _get_versions() -> Dict[str, Optional[str]]:
+    """
+    Return the versions of the code that lints jobs.
+
+    This maps "jenkins-job-linter" to the installed version of this package
+    (or None if it isn't installed), and the "module.qualname" of each
+    jjl.linters entry point target to the distribution and version providing
+    it.
+    """
+    # Deferred because pkg_resources is slow to import, and is only needed
+    # when a cache is in use
+    import pkg_resources
+    try:
+        version = pkg_resources.get_distribution(
+            'jenkins-job-linter').version  # type: Optional[str]
+    except pkg_resources.DistributionNotFound:
+        version = None
+    versions = {'jenkins-job-linter': version}
+    for entry_point in pkg_resources.iter_entry_points('jjl.linters'):
+        target = '.'.join((entry_point.module_name,) + entry_point.attrs)
+        versions[target] = '{} {}'.format(entry_point.dist.project_name,
+                                          entry_point.dist.version)
+    return versions
+
+
+def get_run_fingerprint(config: ConfigParser,
+                        linters: Iterable[Type[Linter]],
+                        object_names: Iterable[str]) -> str:
+    """
+    Return a digest of everything outside a job that can affect its result.
+
+    This covers the (already filtered) configuration, except for options
+    that can't change results (e.g. processes), the linters that will
+    run (including the versions of the distributions providing them, so
+    upgrading jenkins-job-linter or a plugin invalidates the cache) and the
+    names of the objects in the run (which some linters check references
+    against).
+    """
+    versions = _get_versions()
+    linter_names = ['{}.{}'.format(linter.__module__, linter.__qualname__)
+                    for linter in linters]
+    fingerprint = {
+        'version': versions['jenkins-job-linter'],
+        'config': {name: sorted(
+                       (key, value) for key, value in section.items()
+                       if name != 'job_linter'
+                       or key not in _UNFINGERPRINTED_OPTIONS)
+                   for name, section in config.items()},
+        'linters': sorted([name, versions.get(name)]
+                          for name in linter_names),
+        'object_names': sorted(object_names),
+    }
+    return hashlib.sha1(
+        json.dumps(fingerprint, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class LintCache:
+    """
+    A JSON file mapping job name and XML content to a lint result.
+
+    The cache is only valid for a single run fingerprint (see
+    get_run_fingerprint); if the fingerprint stored in the file doesn't match,
+    the file's contents are ignored.  Only the entries used in a run are
+    written back by save, so results for jobs that no longer exist are
+    dropped.
+    """
+
+    def __init__(self, path: str, fingerprint: str) -> None:
+        """
+        Create a LintCache, loading any existing results from path.
+
+        :param path:
+            The file to read the cache from and save it to.
+        :param fingerprint:
+            The run fingerprint that cached results must have been produced
+            under to be used.
+        """
+        self.path = path
+        self.fingerprint = fingerprint
+        self._loaded = self._load()
+        self._results = {}  # type: Dict[str, CachedResult]
+
+    def _load(self) -> Dict[str, CachedResult]:
+        try:
+            with open(self.path) as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        if data.get('fingerprint') != self.fingerprint:
+            return {}
+        try:
+            results = {key: (result, output)
+                       for key, (result, output) in data['results'].items()}
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return {}
+        if not all(isinstance(result, bool) and isinstance(output, str)
+                   for result, output in results.values()):
+            return {}
+        return results
+
+    @staticmethod
+    def _key(job_name: str, job_xml: bytes) -> str:
+        digest = hashlib.sha1(job_name.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(job_xml)
+        return digest.hexdigest()
+
+    def get(self, job_name: str, job_xml: bytes) -> Optional[CachedResult]:
+        """Return the cached (result, output) for a job, or None."""
+        key = self._key(job_name, job_xml)
+        cached = self._loaded.get(key)
+        if cached is not None:
+            self._results[key] = cached
+        return cached
+
+    def set(self, job_name: str, job_xml: bytes, result: bool,
+            output: str) -> None:
+        """Record the result and output of linting a job."""
+        self._results[self._key(job_name, job_xml)] = (result, output)
+
+    def save(self) -> None:
+        """
+        Atomically write the results used in this run to the cache file.
+
+        This raises OSError if the cache file can't be written.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory)
+        try:
+            # mkstemp creates the file readable only by its owner; give it
+            # the permissions a newly-created file normally would have
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp_path, 0o666 & ~umask)
+            with os.fdopen(fd, 'w') as temp_file:
+                json.dump({'fingerprint': self.fingerprint,
+                           'results': self._results}, temp_file)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
@@ -12,17 +12,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Handle configuration for jenkins-job-linter."""
-from configparser import ConfigParser
-from typing import Any, Dict, List
+from configparser import ConfigParser, SectionProxy
+from typing import Any, Callable, Dict, List, Optional, Tuple  # noqa
 
 from jenkins_job_linter.linters import LINTERS
 
 GLOBAL_CONFIG_DEFAULTS = {
+    'cache_file': None,
     'disable_linters': [],
     'only_run': None,
+    'processes': 1,
 }  # type: Dict[str, Any]
 
 
+class ConfigError(ValueError):
+    """Raised when jenkins-job-linter's configuration is invalid."""
+
+
 class GetListConfigParser(ConfigParser):
     """A ConfigParser subclass that implements a getlist method."""
 
@@ -36,6 +42,59 @@ class GetListConfigParser(ConfigParser):
         return self._get_conv(section, option, commas_to_list, **kwargs)
 
 
+_MISSING = object()
+
+
+class CachedSectionProxy(SectionProxy):
+    """
+    A SectionProxy that only resolves each of its values once.
+
+    Every ConfigParser lookup goes through defaults, interpolation and
+    (for getboolean and friends) conversion, and linters look the same
+    options up for every job they check.  A run's configuration doesn't
+    change once it has been loaded, so this remembers the result of each
+    lookup instead.
+    """
+
+    def __init__(self, parser: ConfigParser, name: str) -> None:
+        """Create a view on the section called name in parser."""
+        super().__init__(parser, name)
+        self._resolved = {}  # type: Dict[Tuple[str, Optional[str]], Any]
+
+    def _resolve(self, option: str,
+                 _impl: Optional[Callable[..., Any]]) -> Any:
+        # Key on the converter's name rather than the converter itself: it is
+        # a method bound to the (unhashable) parser, and before Python 3.8
+        # hashing a bound method hashes the object it is bound to
+        key = (option, None if _impl is None else _impl.__name__)
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+        value = _MISSING
+        if self.parser.has_option(self.name, option):
+            value = (_impl or self.parser.get)(self.name, option)
+        self._resolved[key] = value
+        return value
+
+    def __getitem__(self, key: str) -> Any:
+        """Return the value of an option, raising KeyError if it's unset."""
+        value = self._resolve(key, None)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, option: str, fallback: Any = None, *, raw: bool = False,
+            vars: Any = None, _impl: Optional[Callable[..., Any]] = None,
+            **kwargs: Any) -> Any:
+        """Return the (converted, if _impl is given) value of an option."""
+        if raw or vars or kwargs:
+            return super().get(option, fallback, raw=raw, vars=vars,
+                               _impl=_impl, **kwargs)
+        value = self._resolve(option, _impl)
+        return fallback if value is _MISSING else value
+
+
 def _get_default_linter_configs() -> Dict[str, Dict[str, Any]]:
     return {'job_linter:{}'.format(name): linter.default_config
             for name, linter in LINTERS.items()}
@@ -45,14 +104,14 @@ def _filter_config(config: ConfigParser) -> GetListConfigParser:
     """
     Return a ConfigParser with only the job_linter section of the one passed.
 
-    This creates a new ConfigParser and removes sections from that, so the one
-    passed in remains unmodified.
+    This creates a new ConfigParser and copies only the relevant sections in
+    to it, so the one passed in remains unmodified and unrelated sections are
+    never copied.
     """
     filtered_config = GetListConfigParser(allow_no_value=True)
     filtered_config.read_dict({'job_linter': GLOBAL_CONFIG_DEFAULTS})
     filtered_config.read_dict(_get_default_linter_configs())
-    filtered_config.read_dict(config)
-    for section in filtered_config.sections():
-        if not section.startswith('job_linter'):
-            filtered_config.remove_section(section)
+    filtered_config.read_dict({
+        name: section for name, section in config.items()
+        if name == config.default_section or name.startswith('job_linter')})
     return filtered_config
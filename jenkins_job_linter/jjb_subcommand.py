@@ -21,6 +21,7 @@ import jenkins_jobs.cli.subcommand.test as test
 from jenkins_jobs.config import JJBConfig
 
 from jenkins_job_linter import lint_jobs_from_directory
+from jenkins_job_linter.config import ConfigError
 
 LOGGER = logging.getLogger(__name__)
 
@@ -52,6 +53,12 @@ class LintSubCommand(test.TestSubCommand):
 
             super(LintSubCommand, self).execute(options, jjb_config)
 
-            if lint_jobs_from_directory(tmpdir, jjb_config.config_parser):
+            try:
+                result = lint_jobs_from_directory(
+                    tmpdir, jjb_config.config_parser)
+            except ConfigError as exc:
+                print('ERROR: {}'.format(exc), file=sys.stderr)
+                sys.exit(1)
+            if result:
                 sys.exit(0)
             sys.exit(1)
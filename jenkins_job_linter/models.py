@@ -13,7 +13,7 @@
 # limitations under the License.
 """Data classes used in jenkins_job_linter."""
 from configparser import SectionProxy
-from typing import Iterable
+from typing import FrozenSet, Iterable  # noqa
 from xml.etree import ElementTree
 
 
@@ -53,6 +53,7 @@ class RunContext:
 
         :param object_names:
             An iterable containing the names of Jenkins objects that this run
-            is operating against.
+            is operating against.  This is stored as a frozenset, as linters
+            test membership of it repeatedly.
         """
-        self.object_names = object_names
+        self.object_names = frozenset(object_names)  # type: FrozenSet[str]
@@ -0,0 +1,32 @@
+# Copyright (C) 2017  Daniel Watkins <daniel@daniel-watkins.co.uk>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+
+
+@pytest.fixture
+def patch_linters(monkeypatch):
+    """Return a function which replaces LINTERS everywhere it's imported."""
+    def _patch_linters(linters):
+        monkeypatch.setattr('jenkins_job_linter.LINTERS', linters)
+        monkeypatch.setattr('jenkins_job_linter.config.LINTERS', linters)
+        return linters
+    return _patch_linters
+
+
+@pytest.fixture(scope='session')
+def config_ini(tmpdir_factory):
+    """Return the path of a config file which sets job_linter.key."""
+    config_ini = tmpdir_factory.mktemp('config').join('config.ini')
+    config_ini.write('[job_linter]\nkey=value')
+    return str(config_ini)
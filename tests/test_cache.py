@@ -0,0 +1,176 @@
+# Copyright (C) 2017  Daniel Watkins <daniel@daniel-watkins.co.uk>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import os
+
+import pkg_resources
+import pytest
+
+from jenkins_job_linter.cache import (
+    _get_versions,
+    get_run_fingerprint,
+    LintCache,
+)
+from jenkins_job_linter.linters import CheckForEmptyShell, CheckShebang
+
+from .mocks import get_config
+
+
+class TestGetRunFingerprint:
+
+    def _fingerprint(self, config=None, linters=(CheckShebang,),
+                     object_names=('a', 'b')):
+        return get_run_fingerprint(config or get_config(), linters,
+                                   object_names)
+
+    def test_stable(self):
+        assert self._fingerprint() == self._fingerprint()
+
+    def test_object_name_order_ignored(self):
+        assert self._fingerprint() == self._fingerprint(
+            object_names=('b', 'a'))
+
+    def test_config_changes_fingerprint(self):
+        config = get_config()
+        config['job_linter:check_shebang']['required_shell_options'] = 'e'
+        assert self._fingerprint() != self._fingerprint(config=config)
+
+    @pytest.mark.parametrize('option,value', (
+        ('processes', '4'), ('cache_file', 'elsewhere.json')))
+    def test_run_options_ignored(self, option, value):
+        config = get_config()
+        config['job_linter'][option] = value
+        assert self._fingerprint() == self._fingerprint(config=config)
+
+    def test_linters_change_fingerprint(self):
+        assert self._fingerprint() != self._fingerprint(
+            linters=(CheckShebang, CheckForEmptyShell))
+
+    def test_object_names_change_fingerprint(self):
+        assert self._fingerprint() != self._fingerprint(
+            object_names=('a', 'b', 'c'))
+
+    def test_linter_order_ignored(self):
+        assert self._fingerprint(
+            linters=(CheckShebang, CheckForEmptyShell)) == self._fingerprint(
+                linters=(CheckForEmptyShell, CheckShebang))
+
+    @pytest.mark.parametrize('key', (
+        'jenkins-job-linter', 'jenkins_job_linter.linters.CheckShebang'))
+    def test_versions_change_fingerprint(self, key, mocker):
+        versions = _get_versions()
+        fingerprint = self._fingerprint()
+        versions[key] = 'something else'
+        mocker.patch('jenkins_job_linter.cache._get_versions',
+                     return_value=versions)
+        assert fingerprint != self._fingerprint()
+
+
+class TestGetVersions:
+
+    def test_linters_mapped_to_providing_distribution(self):
+        version = pkg_resources.get_distribution('jenkins-job-linter').version
+        versions = _get_versions()
+        assert version == versions['jenkins-job-linter']
+        assert 'jenkins-job-linter {}'.format(version) == versions[
+            'jenkins_job_linter.linters.CheckShebang']
+
+    def test_uninstalled_package_has_no_version(self, mocker):
+        mocker.patch('pkg_resources.get_distribution',
+                     side_effect=pkg_resources.DistributionNotFound)
+        assert _get_versions()['jenkins-job-linter'] is None
+
+
+class TestLintCache:
+
+    @pytest.fixture
+    def cache_path(self, tmpdir):
+        return str(tmpdir.join('cache.json'))
+
+    def test_missing_file_is_empty(self, cache_path):
+        assert LintCache(cache_path, 'fp').get('job', b'<xml/>') is None
+
+    @pytest.mark.parametrize('content', ('not json', '[]'))
+    def test_invalid_file_is_empty(self, cache_path, content):
+        with open(cache_path, 'w') as cache_file:
+            cache_file.write(content)
+        assert LintCache(cache_path, 'fp').get('job', b'<xml/>') is None
+
+    @pytest.mark.parametrize('results', (
+        None, [], {'key': True}, {'key': [True]},
+        {'key': [True, '', 'extra']}, {'key': ['True', '']},
+        {'key': [True, None]},
+    ))
+    def test_malformed_results_are_empty(self, cache_path, results):
+        with open(cache_path, 'w') as cache_file:
+            json.dump({'fingerprint': 'fp', 'results': results}, cache_file)
+        assert {} == LintCache(cache_path, 'fp')._loaded
+
+    def test_missing_results_are_empty(self, cache_path):
+        with open(cache_path, 'w') as cache_file:
+            json.dump({'fingerprint': 'fp'}, cache_file)
+        assert {} == LintCache(cache_path, 'fp')._loaded
+
+    def test_round_trip(self, cache_path):
+        cache = LintCache(cache_path, 'fp')
+        cache.set('job', b'<xml/>', False, 'job: FAIL\n')
+        cache.save()
+        assert (False, 'job: FAIL\n') == LintCache(cache_path, 'fp').get(
+            'job', b'<xml/>')
+
+    @pytest.mark.parametrize('job_name,job_xml,fingerprint', (
+        ('other job', b'<xml/>', 'fp'),
+        ('job', b'<other_xml/>', 'fp'),
+        ('job', b'<xml/>', 'other fp'),
+    ))
+    def test_mismatches_miss(self, cache_path, job_name, job_xml,
+                             fingerprint):
+        cache = LintCache(cache_path, 'fp')
+        cache.set('job', b'<xml/>', True, '')
+        cache.save()
+        assert LintCache(cache_path, fingerprint).get(
+            job_name, job_xml) is None
+
+    def test_only_used_entries_saved(self, cache_path):
+        cache = LintCache(cache_path, 'fp')
+        cache.set('used', b'<xml/>', True, '')
+        cache.set('unused', b'<xml/>', True, '')
+        cache.save()
+        cache = LintCache(cache_path, 'fp')
+        cache.get('used', b'<xml/>')
+        cache.save()
+        cache = LintCache(cache_path, 'fp')
+        assert cache.get('used', b'<xml/>') is not None
+        assert cache.get('unused', b'<xml/>') is None
+
+    def test_save_is_json(self, cache_path):
+        LintCache(cache_path, 'fp').save()
+        with open(cache_path) as cache_file:
+            assert {'fingerprint': 'fp', 'results': {}} == json.load(
+                cache_file)
+
+    def test_failed_save_leaves_no_temporary_file(self, cache_path, mocker):
+        mocker.patch('jenkins_job_linter.cache.os.replace',
+                     side_effect=OSError)
+        with pytest.raises(OSError):
+            LintCache(cache_path, 'fp').save()
+        assert [] == os.listdir(os.path.dirname(cache_path))
+
+    def test_saved_file_respects_umask(self, cache_path):
+        old_umask = os.umask(0o027)
+        try:
+            LintCache(cache_path, 'fp').save()
+        finally:
+            os.umask(old_umask)
+        assert 0o640 == os.stat(cache_path).st_mode & 0o777
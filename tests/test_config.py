@@ -18,6 +18,8 @@ import pytest
 from jenkins_job_linter.config import (
     _filter_config,
     _get_default_linter_configs,
+    CachedSectionProxy,
+    GetListConfigParser,
 )
 from jenkins_job_linter.linters import Linter
 
@@ -80,3 +82,58 @@ class TestFilterConfig:
         config.read_dict({'job_linter': {'opt': 'content'}})
         filtered_config = _filter_config(config)
         assert ['content'] == filtered_config['job_linter'].getlist('opt')
+
+
+class TestCachedSectionProxy:
+
+    def _get_section(self, values):
+        config = GetListConfigParser()
+        config.read_dict({'job_linter': values})
+        return CachedSectionProxy(config, 'job_linter')
+
+    @pytest.mark.parametrize('getter,value,expected', (
+        ('get', 'string', 'string'),
+        ('getboolean', 'false', False),
+        ('getint', '3', 3),
+        ('getlist', 'eggs, spam', ['eggs', 'spam']),
+    ))
+    def test_getters(self, expected, getter, value):
+        section = self._get_section({'opt': value})
+        assert expected == getattr(section, getter)('opt')
+
+    def test_converters_on_filtered_config(self, mocker):
+        mocker.patch('jenkins_job_linter.config.LINTERS', {})
+        config = configparser.ConfigParser()
+        config.read_dict({'job_linter': {'flag': 'true', 'items': 'a, b'}})
+        section = CachedSectionProxy(_filter_config(config), 'job_linter')
+        assert section.getboolean('flag') is True
+        assert ['a', 'b'] == section.getlist('items')
+        assert 'true' == section['flag']
+
+    def test_getitem(self):
+        section = self._get_section({'opt': 'value'})
+        assert 'value' == section['opt']
+
+    def test_getitem_missing_option(self):
+        section = self._get_section({})
+        with pytest.raises(KeyError):
+            section['opt']
+
+    def test_get_missing_option_returns_fallback(self):
+        section = self._get_section({})
+        assert section.getboolean('opt') is None
+        assert 'default' == section.get('opt', 'default')
+
+    def test_values_only_resolved_once(self, mocker):
+        section = self._get_section({'opt': 'true'})
+        has_option_spy = mocker.spy(section.parser, 'has_option')
+        for _ in range(3):
+            assert 'true' == section['opt']
+            assert section.getboolean('opt') is True
+        # Once for the raw value, once for the boolean
+        assert 2 == has_option_spy.call_count
+
+    def test_raw_lookups_not_cached(self):
+        section = self._get_section({'opt': '%(other)s', 'other': 'value'})
+        assert 'value' == section.get('opt')
+        assert '%(other)s' == section.get('opt', raw=True)
@@ -13,45 +13,121 @@
 # limitations under the License.
 import configparser
 import os
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
 from xml.etree import ElementTree
 
+import click
 import pytest
 from click.testing import CliRunner
 
 from jenkins_job_linter import (
+    JENKINS_FETCH_WORKERS,
     lint_job_xml,
     lint_jobs_from_directory,
     lint_jobs_from_running_jenkins,
     main,
 )
+from jenkins_job_linter.config import ConfigError
 from jenkins_job_linter.linters import Linter, LintResult
 
-from .mocks import create_mock_for_class, get_config, mock_LINTERS
+from .mocks import (
+    create_dir_entry_mock,
+    create_dir_entry_mocks,
+    create_linter_mocks,
+    create_mock_for_class,
+    get_config,
+    mock_LINTERS,
+    mock_scandir,
+)
+
+# CliRunner holds no state between invocations, so one can be shared
+RUNNER = CliRunner()
+
+RUN_CTX = mock.sentinel.run_ctx
+TREE = mock.sentinel.tree
+
+DIR_FILENAMES = ('some', 'files')
+
+JENKINS_JOB_NAMES = ('a job', 'another job')
+
+# What jenkins.Jenkins.get_jobs returns for JENKINS_JOB_NAMES
+JENKINS_JOBS = [{'name': name} for name in JENKINS_JOB_NAMES]
+
+# Shared by tests that don't care about configuration; lint_jobs_from_* leave
+# the config they are passed unmodified
+EMPTY_CONFIG = configparser.ConfigParser()
+
+
+def _convert_path_param(command, param_name, path, readable=True):
+    """
+    Run a path through a command's click.Path parameter, as click would.
+
+    If readable is False, os.access reports the path (and only the path) as
+    unreadable; chmod can't be used for that, as it doesn't stop root.
+    """
+    param = next(param for param in command.params if param.name == param_name)
+    path = str(path)
+    real_access = os.access
+
+    def access(access_path, mode, *args, **kwargs):
+        if access_path == path and not readable:
+            return False
+        return real_access(access_path, mode, *args, **kwargs)
+
+    with mock.patch('click.types.os.access', side_effect=access):
+        return param.type.convert(path, param, click.Context(command))
+
+
+def _invoke_for_exit_code(command, **kwargs):
+    """Call a command's callback without parsing argv, returning its exit."""
+    with click.Context(command) as ctx:
+        with pytest.raises(SystemExit) as excinfo:
+            ctx.invoke(command, **kwargs)
+    return excinfo.value.code
+
+
+@pytest.fixture(scope='module')
+def _shared_linter_mocks():
+    return {(result, msg): create_mock_for_class(
+                Linter, check_result=result, check_msg=msg)
+            for result, msg in ((LintResult.PASS, None),
+                                (LintResult.FAIL, None),
+                                (LintResult.FAIL, 'msg'))}
+
+
+@pytest.fixture
+def linter_mock_pool(_shared_linter_mocks):
+    # The mocks are shared across the module, so clear their calls to keep
+    # tests independent of the order they run in
+    for linter_mock in _shared_linter_mocks.values():
+        linter_mock.reset_mock()
+    return _shared_linter_mocks
 
 
 class TestLintJobXML:
 
-    def test_all_linters_called_with_tree_and_run_ctx(self, mocker):
-        linter_mocks = [create_mock_for_class(Linter) for _ in range(3)]
-        mock_LINTERS(mocker, linter_mocks)
+    def test_all_linters_called_with_tree_and_run_ctx(self, mocker,
+                                                      patch_linters):
+        linter_mocks = create_linter_mocks(3)
+        mock_LINTERS(patch_linters, linter_mocks)
         lint_context_mock = mocker.patch('jenkins_job_linter.LintContext')
-        run_ctx = mocker.Mock()
-        lint_job_xml(run_ctx, 'job_name', mocker.sentinel.tree, get_config())
-        for linter_mock in linter_mocks:
-            assert linter_mock.call_count == 1
-            assert linter_mock.call_args == mocker.call(
-                lint_context_mock.return_value)
-        for call_args in lint_context_mock.call_args_list:
-            assert mocker.call(
-                mocker.ANY, run_ctx, mocker.sentinel.tree) == call_args
-
-    def test_lintcontext_passed_filtered_config(self, mocker):
-        linters = mock_LINTERS(mocker, [create_mock_for_class(Linter)])
+        lint_job_xml(RUN_CTX, 'job_name', TREE, get_config())
+        # Each linter is called exactly once, with its LintContext
+        assert [[mocker.call(lint_context_mock.return_value)]] * len(
+            linter_mocks) == [linter_mock.call_args_list
+                              for linter_mock in linter_mocks]
+        assert [mocker.call(mocker.ANY, RUN_CTX, TREE)] * len(
+            linter_mocks) == lint_context_mock.call_args_list
+
+    def test_lintcontext_passed_filtered_config(self, mocker, patch_linters):
+        linters = mock_LINTERS(patch_linters, [create_mock_for_class(Linter)])
         config = get_config()
         section_name = 'job_linter:{}'.format(list(linters.keys())[0])
         config[section_name]['k'] = 'v'
         lint_context_mock = mocker.patch('jenkins_job_linter.LintContext')
-        lint_job_xml(mocker.Mock(), 'job_name', mocker.sentinel.tree, config)
+        lint_job_xml(RUN_CTX, 'job_name', TREE, config)
         lint_context_config = lint_context_mock.call_args[0][0]
         assert 'v' == lint_context_config['k']
 
@@ -61,75 +137,83 @@ class TestLintJobXML:
         (False, (LintResult.PASS, LintResult.FAIL)),
         (False, (LintResult.PASS, LintResult.FAIL, LintResult.PASS)),
     ))
-    def test_result_aggregation(self, mocker, expected, results):
-        linter_mocks = []
-        for result in results:
-            mock = create_mock_for_class(Linter, check_result=result)
-            linter_mocks.append(mock)
-        mock_LINTERS(mocker, linter_mocks)
-        assert lint_job_xml(mocker.Mock(), 'job_name', mocker.sentinel.tree,
+    def test_result_aggregation(self, expected, linter_mock_pool, results,
+                                patch_linters):
+        linter_mocks = [linter_mock_pool[result, None] for result in results]
+        mock_LINTERS(patch_linters, linter_mocks)
+        assert lint_job_xml(RUN_CTX, 'job_name', TREE,
                             get_config()) is expected
-
-    def test_linters_can_return_text(self, mocker):
-        mock_LINTERS(mocker, [
-            create_mock_for_class(
-                Linter, check_result=LintResult.FAIL, check_msg='msg')])
-        assert lint_job_xml(mocker.Mock(), 'job_name', mocker.sentinel.tree,
+        assert len(results) == sum(linter_mock.call_count
+                                   for linter_mock in set(linter_mocks))
+
+    def test_linters_can_return_text(self, capsys, linter_mock_pool,
+                                     patch_linters):
+        mock_LINTERS(patch_linters,
+                     [linter_mock_pool[LintResult.FAIL, 'msg']])
+        assert lint_job_xml(RUN_CTX, 'job_name', TREE,
                             get_config()) is False
+        assert capsys.readouterr().out.endswith(': FAIL: msg\n')
 
-    def test_disable_linters_config(self, mocker):
-        linters = {
-            'disable_me': create_mock_for_class(Linter),
-            'not_me': create_mock_for_class(Linter),
-        }
-        mocker.patch('jenkins_job_linter.LINTERS', linters)
-        mocker.patch('jenkins_job_linter.config.LINTERS', linters)
-        config = get_config()
-        config['job_linter']['disable_linters'] = 'disable_me'
-        lint_job_xml(mocker.Mock(), 'job_name', mocker.Mock(), config)
-        assert 0 == linters['disable_me'].call_count
-        assert 1 == linters['not_me'].call_count
-
-    def test_disable_linters_overlapping_linter_prefixes(self, mocker):
-        linters = {
-            'do': create_mock_for_class(Linter),
-            'dont': create_mock_for_class(Linter),
-        }
-        mocker.patch('jenkins_job_linter.LINTERS', linters)
-        mocker.patch('jenkins_job_linter.config.LINTERS', linters)
-        config = get_config()
-        config['job_linter']['disable_linters'] = 'dont,another'
-        lint_job_xml(mocker.Mock(), 'job_name', mocker.Mock(), config)
-        assert 1 == linters['do'].call_count
-        assert 0 == linters['dont'].call_count
-
-    def test_only_run_config(self, mocker):
-        linters = {
-            'only_me': create_mock_for_class(Linter),
-            'not_me': create_mock_for_class(Linter),
-            'or_me': create_mock_for_class(Linter),
-        }
-        mocker.patch('jenkins_job_linter.LINTERS', linters)
-        mocker.patch('jenkins_job_linter.config.LINTERS', linters)
-        config = get_config()
-        config['job_linter']['only_run'] = 'only_me'
-        lint_job_xml(mocker.Mock(), 'job_name', mocker.Mock(), config)
-        assert 0 == linters['not_me'].call_count
-        assert 0 == linters['or_me'].call_count
-        assert 1 == linters['only_me'].call_count
-
-    def test_only_run_overlapping_linter_prefixes(self, mocker):
-        linters = {
-            'do': create_mock_for_class(Linter),
-            'dont': create_mock_for_class(Linter),
-        }
-        mocker.patch('jenkins_job_linter.LINTERS', linters)
-        mocker.patch('jenkins_job_linter.config.LINTERS', linters)
+    def test_failures_output_together(self, mocker, patch_linters):
+        mock_LINTERS(patch_linters, [
+            create_mock_for_class(
+                Linter, check_result=LintResult.FAIL, check_msg='msg',
+                description='first'),
+            create_mock_for_class(Linter, description='passing'),
+            create_mock_for_class(
+                Linter, check_result=LintResult.FAIL, description='second'),
+        ])
+        print_mock = mocker.patch('jenkins_job_linter.print', create=True)
+        lint_job_xml(RUN_CTX, 'job_name', TREE, get_config())
+        assert [mocker.call('job_name: first: FAIL: msg\n'
+                            'job_name: second: FAIL')] == (
+            print_mock.call_args_list)
+
+    def test_no_output_on_success(self, capsys, patch_linters):
+        mock_LINTERS(patch_linters, [create_mock_for_class(Linter)])
+        lint_job_xml(RUN_CTX, 'job_name', TREE, get_config())
+        assert '' == capsys.readouterr().out
+
+    def test_passed_enabled_linters_used(self, mocker, patch_linters):
+        mock_LINTERS(patch_linters, [create_mock_for_class(Linter)])
+        linter_mock = create_mock_for_class(Linter)
+        lint_context_mock = mocker.patch('jenkins_job_linter.LintContext')
+        lint_job_xml(RUN_CTX, 'job_name', TREE,
+                     get_config(), enabled_linters=[
+                         (linter_mock, mocker.sentinel.section)])
+        assert 1 == linter_mock.call_count
+        assert mocker.sentinel.section == lint_context_mock.call_args[0][0]
+
+    @pytest.mark.parametrize('option,value,expected_call_counts', (
+        ('disable_linters', 'disable_me',
+         {'disable_me': 0, 'not_me': 1}),
+        # Check that disabling "dont" doesn't also disable "do"
+        ('disable_linters', 'dont,another', {'do': 1, 'dont': 0}),
+        ('only_run', 'only_me', {'only_me': 1, 'not_me': 0, 'or_me': 0}),
+        # Check that only running "dont" doesn't also run "do"
+        ('only_run', 'dont', {'do': 0, 'dont': 1}),
+    ))
+    def test_linter_selection_config(self, expected_call_counts, option,
+                                     patch_linters, value):
+        linters = patch_linters({name: create_mock_for_class(Linter)
+                                 for name in expected_call_counts})
         config = get_config()
-        config['job_linter']['only_run'] = 'dont'
-        lint_job_xml(mocker.Mock(), 'job_name', mocker.Mock(), config)
-        assert 0 == linters['do'].call_count
-        assert 1 == linters['dont'].call_count
+        config['job_linter'][option] = value
+        lint_job_xml(RUN_CTX, 'job_name', TREE, config)
+        assert expected_call_counts == {
+            name: linter.call_count for name, linter in linters.items()}
+
+
+@pytest.fixture
+def mixed_config():
+    # Built afresh for each test, so that one test modifying it can't hide
+    # that from test_config_passed_in_isnt_modified
+    config = configparser.ConfigParser()
+    config.read_dict({'jenkins': {},
+                      'job_builder': {},
+                      'something_else': {},
+                      'job_linter': {}})
+    return config
 
 
 @pytest.mark.parametrize('test_type', ('directory', 'jenkins'))
@@ -141,11 +225,10 @@ class TestCommonConfigParsing:
             jenkins_mock = mocker.patch('jenkins_job_linter.jenkins.Jenkins')
             jenkins_mock.return_value.get_jobs.return_value = [
                 {'name': 'a'}, {'name': 'b'}]
-            mocker.patch('jenkins_job_linter.ElementTree')
+            jenkins_mock.return_value.get_job_config.return_value = '<job />'
             return mocker.patch('jenkins_job_linter.lint_job_xml')
         elif test_type == 'directory':
-            listdir_mock = mocker.patch('jenkins_job_linter.os.listdir')
-            listdir_mock.return_value = ['some', 'files']
+            mock_scandir(mocker, 'dirname', ['some', 'files'])
             mocker.patch('jenkins_job_linter.ElementTree.parse')
             return mocker.patch('jenkins_job_linter.lint_job_xml')
         raise Exception('unknown test_type')
@@ -158,132 +241,322 @@ class TestCommonConfigParsing:
             return lint_jobs_from_directory('dirname', config)
         raise Exception('unknown test_type')
 
-    def test_filtered_config_passed_to_lint_job_xml(self, test_type, mocker):
-        mocker.patch('jenkins_job_linter.config.LINTERS', {})
-        mocker.patch('jenkins_job_linter.config.GLOBAL_CONFIG_DEFAULTS', {})
-        config = configparser.ConfigParser()
-        config.read_dict({'jenkins': {},
-                          'job_builder': {},
-                          'something_else': {},
-                          'job_linter': {}})
+    def test_filtered_config_passed_to_lint_job_xml(self, mixed_config,
+                                                    test_type, mocker,
+                                                    patch_linters):
+        patch_linters({})
         lint_job_xml_mock = self._setup_mocks(test_type, mocker)
-        self._do_call(test_type, mocker, config)
+        self._do_call(test_type, mocker, mixed_config)
         passed_config = lint_job_xml_mock.call_args[0][3]
         assert ['job_linter'] == passed_config.sections()
 
-    def test_config_passed_in_isnt_modified(self, test_type, mocker):
+    def test_config_passed_in_isnt_modified(self, mixed_config, test_type,
+                                            mocker):
         self._setup_mocks(test_type, mocker)
-        config = configparser.ConfigParser()
-        config.read_dict({'jenkins': {},
-                          'job_builder': {},
-                          'something_else': {},
-                          'job_linter': {}})
-        expected_sections_after = config.sections()
-        self._do_call(test_type, mocker, config)
-        assert expected_sections_after == config.sections()
+        self._do_call(test_type, mocker, mixed_config)
+        assert ['jenkins', 'job_builder', 'something_else',
+                'job_linter'] == mixed_config.sections()
 
     def test_defaults_used(self, test_type, mocker):
         lint_job_xml_mock = self._setup_mocks(test_type, mocker)
-        defaults = {'test': 'this'}
-        mocker.patch('jenkins_job_linter.config.GLOBAL_CONFIG_DEFAULTS',
-                     defaults)
-        self._do_call(test_type, mocker, configparser.ConfigParser())
+        mocker.patch.dict('jenkins_job_linter.config.GLOBAL_CONFIG_DEFAULTS',
+                          {'test': 'this'})
+        self._do_call(test_type, mocker, EMPTY_CONFIG)
         passed_config = lint_job_xml_mock.call_args[0][3]
         assert passed_config['job_linter']['test'] == 'this'
 
+    def test_enabled_linters_computed_once(self, test_type, mocker):
+        lint_job_xml_mock = self._setup_mocks(test_type, mocker)
+        get_enabled_linters_mock = mocker.patch(
+            'jenkins_job_linter._get_enabled_linters')
+        self._do_call(test_type, mocker, EMPTY_CONFIG)
+        assert 1 == get_enabled_linters_mock.call_count
+        for call_args in lint_job_xml_mock.call_args_list:
+            assert (get_enabled_linters_mock.return_value
+                    == call_args[1]['enabled_linters'])
+
+
+@pytest.fixture
+def dir_patches(monkeypatch):
+    """
+    Replace the directory listing, parsing and linting of job files.
+
+    The listing defaults to DIR_FILENAMES in 'dir'; tests that need a
+    different listing override scandir's return_value.
+    """
+    entries = create_dir_entry_mocks('dir', DIR_FILENAMES)
+    patches = SimpleNamespace(scandir=mock.MagicMock(return_value=entries),
+                              parse=mock.MagicMock(),
+                              lint_job_xml=mock.MagicMock())
+    monkeypatch.setattr('jenkins_job_linter.os.scandir', patches.scandir)
+    monkeypatch.setattr('jenkins_job_linter.ElementTree.parse', patches.parse)
+    monkeypatch.setattr('jenkins_job_linter.lint_job_xml',
+                        patches.lint_job_xml)
+    return patches
+
 
 class TestLintJobsFromDirectory:
 
-    def test_empty_directory(self, mocker):
-        listdir_mock = mocker.patch('jenkins_job_linter.os.listdir')
-        listdir_mock.return_value = []
-        assert lint_jobs_from_directory('dir', mocker.MagicMock())
+    def test_empty_directory(self, dir_patches):
+        dir_patches.scandir.return_value = []
+        assert lint_jobs_from_directory('dir', EMPTY_CONFIG)
 
-    def test_context_job_name_and_tree_passed_to_lint_job_xml(self, mocker):
-        listdir_mock = mocker.patch('jenkins_job_linter.os.listdir')
-        listdir_mock.return_value = ['some', 'files']
-        et_parse_mock = mocker.patch('jenkins_job_linter.ElementTree.parse')
-        lint_job_xml_mock = mocker.patch('jenkins_job_linter.lint_job_xml')
+    def test_context_job_name_and_tree_passed_to_lint_job_xml(
+            self, dir_patches, mocker):
         runcontext_mock = mocker.patch('jenkins_job_linter.RunContext')
-        lint_jobs_from_directory('dir', mocker.MagicMock())
-        assert len(listdir_mock.return_value) == lint_job_xml_mock.call_count
-        for filename in listdir_mock.return_value:
-            assert (
-                mocker.call(runcontext_mock.return_value, filename,
-                            et_parse_mock.return_value, mocker.ANY)
-                in lint_job_xml_mock.call_args_list)
-
-    def test_passed_directory_is_used_for_listing(self, mocker):
-        listdir_mock = mocker.patch('jenkins_job_linter.os.listdir')
-        listdir_mock.return_value = []
-        dirname = 'dir'
-        lint_jobs_from_directory(dirname, mocker.MagicMock())
-        assert mocker.call(dirname) == listdir_mock.call_args
-
-    def test_constructed_paths_used_for_parsing(self, mocker):
-        listdir_mock = mocker.patch('jenkins_job_linter.os.listdir')
-        listdir_mock.return_value = ['some', 'files']
-        et_parse_mock = mocker.patch('jenkins_job_linter.ElementTree.parse')
-        mocker.patch('jenkins_job_linter.lint_job_xml')
-        dirname = 'dir'
-        lint_jobs_from_directory(dirname, mocker.MagicMock())
-        expected_paths = set(
-            os.path.join(dirname, f) for f in listdir_mock.return_value)
-        assert expected_paths == set(
-            [call_args[0][0] for call_args in et_parse_mock.call_args_list])
-
-    def test_listdir_return_used_as_object_list(self, mocker):
-        listdir_mock = mocker.patch('jenkins_job_linter.os.listdir')
-        listdir_mock.return_value = ['some', 'files']
+        lint_jobs_from_directory('dir', EMPTY_CONFIG)
+        assert 1 == runcontext_mock.call_count
+        assert [mocker.call(runcontext_mock.return_value, filename,
+                            dir_patches.parse.return_value, mocker.ANY,
+                            enabled_linters=mocker.ANY)
+                for filename in DIR_FILENAMES] == (
+            dir_patches.lint_job_xml.call_args_list)
+
+    def test_passed_directory_is_used_for_listing(self, dir_patches, mocker):
+        lint_jobs_from_directory('dir', EMPTY_CONFIG)
+        assert mocker.call('dir') == dir_patches.scandir.call_args
+
+    def test_entry_paths_used_for_parsing(self, dir_patches):
+        lint_jobs_from_directory('dir', EMPTY_CONFIG)
+        assert [entry.path for entry in dir_patches.scandir.return_value] == [
+            call_args[0][0] for call_args in dir_patches.parse.call_args_list]
+
+    def test_entry_names_used_as_object_list(self, dir_patches):
+        lint_jobs_from_directory('dir', EMPTY_CONFIG)
+        passed_ctx = dir_patches.lint_job_xml.call_args[0][0]
+        assert set(DIR_FILENAMES) == passed_ctx.object_names
+
+    def test_non_files_skipped(self, dir_patches, mocker):
+        dir_patches.scandir.return_value = [
+            create_dir_entry_mock('dir', 'file'),
+            create_dir_entry_mock('dir', 'subdir', is_file=False),
+        ]
+        lint_jobs_from_directory('dir', EMPTY_CONFIG)
+        assert [mocker.call(os.path.join('dir', 'file'))] == (
+            dir_patches.parse.call_args_list)
+        passed_ctx = dir_patches.lint_job_xml.call_args[0][0]
+        assert {'file'} == passed_ctx.object_names
+
+
+class TestLintJobsFromDirectoryInProcesses:
+
+    def _setup_mocks(self, mocker, processes, filenames=('some', 'files')):
+        mock_scandir(mocker, 'dir', filenames)
         mocker.patch('jenkins_job_linter.ElementTree.parse')
+        executor_mock = mocker.patch('jenkins_job_linter.ProcessPoolExecutor')
+        executor_mock.return_value.__enter__.return_value.map.side_effect = (
+            lambda func, *iterables, chunksize: map(func, *iterables))
+        config = configparser.ConfigParser()
+        config.read_dict({'job_linter': {'processes': processes}})
+        return executor_mock, config
+
+    def test_no_pool_used_by_default(self, mocker):
+        executor_mock, _ = self._setup_mocks(mocker, 1)
+        mocker.patch('jenkins_job_linter.lint_job_xml')
+        lint_jobs_from_directory('dir', EMPTY_CONFIG)
+        assert 0 == executor_mock.call_count
+
+    @pytest.mark.parametrize('processes,cpu_count,max_workers', (
+        (0, 4, 4),
+        (0, None, 1),
+        (3, 4, 3),
+    ))
+    def test_processes_passed_as_max_workers(self, mocker, processes,
+                                             cpu_count, max_workers):
+        executor_mock, config = self._setup_mocks(mocker, processes)
+        mocker.patch('jenkins_job_linter.os.cpu_count', return_value=cpu_count)
+        mocker.patch('jenkins_job_linter.lint_job_xml')
+        lint_jobs_from_directory('dir', config)
+        assert mocker.call(max_workers=max_workers) == executor_mock.call_args
+
+    @pytest.mark.parametrize('job_count,processes,chunksize', (
+        (2, 2, 1),
+        (100, 2, 12),
+        (100, 30, 1),
+    ))
+    def test_jobs_chunked_across_workers(self, mocker, job_count, processes,
+                                         chunksize):
+        executor_mock, config = self._setup_mocks(
+            mocker, processes,
+            ['job{}'.format(index) for index in range(job_count)])
+        mocker.patch('jenkins_job_linter.lint_job_xml')
+        lint_jobs_from_directory('dir', config)
+        map_mock = executor_mock.return_value.__enter__.return_value.map
+        assert chunksize == map_mock.call_args[1]['chunksize']
+
+    def test_output_emitted_in_directory_order(self, capsys, mocker):
+        _, config = self._setup_mocks(mocker, 2)
         lint_job_xml_mock = mocker.patch('jenkins_job_linter.lint_job_xml')
-        lint_jobs_from_directory('dir', mocker.MagicMock())
-        passed_ctx = lint_job_xml_mock.call_args[0][0]
-        assert listdir_mock.return_value == passed_ctx.object_names
+        lint_job_xml_mock.side_effect = (
+            lambda ctx, job_name, tree, config, **kwargs: print(job_name))
+        lint_jobs_from_directory('dir', config)
+        assert 'some\nfiles\n' == capsys.readouterr().out
+
+    @pytest.mark.parametrize('expected,results', (
+        (True, (True, True)),
+        (False, (True, False)),
+        (False, (False, True)),
+    ))
+    def test_result_aggregation(self, expected, mocker, results):
+        _, config = self._setup_mocks(mocker, 2)
+        lint_job_xml_mock = mocker.patch('jenkins_job_linter.lint_job_xml')
+        lint_job_xml_mock.side_effect = results
+        assert expected is lint_jobs_from_directory('dir', config)
+
+    @pytest.mark.parametrize('processes', ('-1', 'many', '1.5', ''))
+    def test_invalid_processes_rejected(self, mocker, processes):
+        executor_mock, config = self._setup_mocks(mocker, processes)
+        lint_job_xml_mock = mocker.patch('jenkins_job_linter.lint_job_xml')
+        with pytest.raises(ConfigError) as excinfo:
+            lint_jobs_from_directory('dir', config)
+        assert 'job_linter.processes' in str(excinfo.value)
+        assert 0 == executor_mock.call_count
+        assert 0 == lint_job_xml_mock.call_count
+
+    def test_real_workers_match_in_process_run(self, capsys, tmpdir):
+        # Nothing is mocked, so this checks that everything shared with the
+        # workers (RunContext, the config and the linters' config sections)
+        # survives being pickled into real processes
+        job_dir = tmpdir.mkdir('jobs')
+        job_dir.join('good').write(
+            '<project><builders><hudson.tasks.Shell><command>#!/bin/sh -eux\n'
+            'true</command></hudson.tasks.Shell></builders></project>')
+        job_dir.join('empty').write(
+            '<project><builders><hudson.tasks.Shell><command></command>'
+            '</hudson.tasks.Shell></builders></project>')
+        results = []
+        for processes in (1, 2):
+            config = configparser.ConfigParser()
+            config.read_dict({'job_linter': {'processes': processes}})
+            result = lint_jobs_from_directory(str(job_dir), config)
+            results.append((result, capsys.readouterr().out))
+        assert results[0] == results[1]
+        result, output = results[1]
+        assert result is False
+        assert ('empty: checking shell builder shell scripts are not empty:'
+                ' FAIL') in output
+
+
+class TestLintJobsFromDirectoryWithCache:
+
+    @pytest.fixture
+    def job_dir(self, tmpdir):
+        job_dir = tmpdir.mkdir('jobs')
+        for name in ('some', 'files'):
+            job_dir.join(name).write(
+                '<project><name>{}</name></project>'.format(name))
+        return job_dir
+
+    def _config(self, tmpdir, processes=1):
+        config = configparser.ConfigParser()
+        config.read_dict({'job_linter': {
+            'cache_file': str(tmpdir.join('cache.json')),
+            'processes': processes,
+        }})
+        return config
+
+    def _mock_lint_job_xml(self, mocker, result=True):
+        def lint_job_xml(ctx, job_name, tree, config, **kwargs):
+            print(job_name, tree.find('name').text)
+            return result
+        return mocker.patch('jenkins_job_linter.lint_job_xml',
+                            side_effect=lint_job_xml)
+
+    def test_first_run_lints_everything(self, capsys, job_dir, mocker,
+                                        tmpdir):
+        lint_job_xml_mock = self._mock_lint_job_xml(mocker)
+        lint_jobs_from_directory(str(job_dir), self._config(tmpdir))
+        assert 2 == lint_job_xml_mock.call_count
+        assert ['files files', 'some some'] == sorted(
+            capsys.readouterr().out.splitlines())
+
+    @pytest.mark.parametrize('result', (True, False))
+    def test_second_run_replays_cache(self, capsys, job_dir, mocker, result,
+                                      tmpdir):
+        self._mock_lint_job_xml(mocker, result)
+        first_result = lint_jobs_from_directory(
+            str(job_dir), self._config(tmpdir))
+        first_output = capsys.readouterr().out
+        lint_job_xml_mock = self._mock_lint_job_xml(mocker, not result)
+        assert first_result is lint_jobs_from_directory(
+            str(job_dir), self._config(tmpdir))
+        assert 0 == lint_job_xml_mock.call_count
+        assert first_output == capsys.readouterr().out
+
+    def test_changed_job_relinted(self, capsys, job_dir, mocker, tmpdir):
+        self._mock_lint_job_xml(mocker)
+        lint_jobs_from_directory(str(job_dir), self._config(tmpdir))
+        job_dir.join('some').write('<project><name>new</name></project>')
+        capsys.readouterr()
+        lint_job_xml_mock = self._mock_lint_job_xml(mocker)
+        lint_jobs_from_directory(str(job_dir), self._config(tmpdir))
+        assert 1 == lint_job_xml_mock.call_count
+        assert 'some' == lint_job_xml_mock.call_args[0][1]
+        assert ['files files', 'some new'] == sorted(
+            capsys.readouterr().out.splitlines())
+
+    def test_unwritable_cache_warns(self, capsys, job_dir, mocker, tmpdir):
+        self._mock_lint_job_xml(mocker, False)
+        assert lint_jobs_from_directory(
+            str(job_dir), self._config(tmpdir.join('missing'))) is False
+        captured = capsys.readouterr()
+        assert ['files files', 'some some'] == sorted(
+            captured.out.splitlines())
+        assert 'could not save lint cache' in captured.err
+
+    def test_misses_linted_in_processes(self, capsys, job_dir, mocker,
+                                        tmpdir):
+        executor_mock = mocker.patch('jenkins_job_linter.ProcessPoolExecutor')
+        executor_mock.return_value.__enter__.return_value.map.side_effect = (
+            lambda func, *iterables, chunksize: map(func, *iterables))
+        self._mock_lint_job_xml(mocker)
+        lint_jobs_from_directory(str(job_dir), self._config(tmpdir, 2))
+        assert 1 == executor_mock.call_count
+        assert ['files files', 'some some'] == sorted(
+            capsys.readouterr().out.splitlines())
 
 
 class TestLintJobsFromRunningJenkins:
 
-    def test_parameters_passed_through_to_jenkins(self, mocker):
+    @pytest.fixture
+    def jenkins_mock(self, mocker):
         jenkins_mock = mocker.patch('jenkins_job_linter.jenkins.Jenkins')
+        jenkins_mock.return_value.get_jobs.return_value = []
+        return jenkins_mock
+
+    def test_parameters_passed_through_to_jenkins(self, jenkins_mock, mocker):
         url, username, password = 'url', 'username', 'password'
 
         lint_jobs_from_running_jenkins(
-            url, username, password, mocker.MagicMock())
+            url, username, password, EMPTY_CONFIG)
 
         assert 1 == jenkins_mock.call_count
         assert mocker.call(url, username=username,
                            password=password) == jenkins_mock.call_args
 
-    def test_empty_jenkins(self, mocker):
-        jenkins_mock = mocker.patch('jenkins_job_linter.jenkins.Jenkins')
-        jenkins_mock.return_value.get_jobs.return_value = []
-
+    def test_empty_jenkins(self, jenkins_mock):
         assert lint_jobs_from_running_jenkins(
-            'url', 'username', 'password', mocker.MagicMock())
+            'url', 'username', 'password', EMPTY_CONFIG)
 
-    def test_context_job_name_and_tree_passed_to_lint_job_xml(self, mocker):
-        job_names = ['a job', 'another job']
-        jenkins_mock = mocker.patch('jenkins_job_linter.jenkins.Jenkins')
-        jenkins_mock.return_value.get_jobs.return_value = [
-            {'name': name} for name in job_names]
+    def test_context_job_name_and_tree_passed_to_lint_job_xml(
+            self, jenkins_mock, mocker):
+        jenkins_mock.return_value.get_jobs.return_value = JENKINS_JOBS
         et_mock = mocker.patch('jenkins_job_linter.ElementTree')
         lint_job_xml_mock = mocker.patch('jenkins_job_linter.lint_job_xml')
         runcontext_mock = mocker.patch('jenkins_job_linter.RunContext')
 
         lint_jobs_from_running_jenkins(
-            'url', 'username', 'password', mocker.MagicMock())
+            'url', 'username', 'password', EMPTY_CONFIG)
 
-        assert len(job_names) == lint_job_xml_mock.call_count
-        for job_name in job_names:
-            assert (
-                mocker.call(runcontext_mock.return_value, job_name,
-                            et_mock.ElementTree.return_value, mocker.ANY)
-                in lint_job_xml_mock.call_args_list)
+        assert 1 == runcontext_mock.call_count
+        assert [mocker.call(runcontext_mock.return_value, job_name,
+                            et_mock.ElementTree.return_value, mocker.ANY,
+                            enabled_linters=mocker.ANY)
+                for job_name in JENKINS_JOB_NAMES] == (
+            lint_job_xml_mock.call_args_list)
 
-    def test_job_xml_parsed_and_passed(self, mocker):
+    def test_job_xml_parsed_and_passed(self, jenkins_mock, mocker):
         job_names = ['a job']
-        jenkins_mock = mocker.patch('jenkins_job_linter.jenkins.Jenkins')
         jenkins_mock.return_value.get_jobs.return_value = [
             {'name': name} for name in job_names]
         xml_string = b'<element />'
@@ -291,53 +564,101 @@ class TestLintJobsFromRunningJenkins:
         lint_job_xml_mock = mocker.patch('jenkins_job_linter.lint_job_xml')
 
         lint_jobs_from_running_jenkins(
-            'url', 'username', 'password', mocker.MagicMock())
+            'url', 'username', 'password', EMPTY_CONFIG)
 
         element_tree = lint_job_xml_mock.call_args[0][2]
         assert xml_string == ElementTree.tostring(element_tree.getroot())
 
-    def test_returned_job_list_used_as_object_list(self, mocker):
-        job_names = ['a job', 'another job']
-        jenkins_mock = mocker.patch('jenkins_job_linter.jenkins.Jenkins')
+    def test_each_job_linted_with_its_own_xml(self, jenkins_mock, mocker):
+        job_names = ['a job', 'another job', 'a third job']
         jenkins_mock.return_value.get_jobs.return_value = [
             {'name': name} for name in job_names]
+        jenkins_mock.return_value.get_job_config.side_effect = (
+            lambda name: '<{} />'.format(name.replace(' ', '_')))
+        lint_job_xml_mock = mocker.patch('jenkins_job_linter.lint_job_xml')
+
+        lint_jobs_from_running_jenkins(
+            'url', 'username', 'password', EMPTY_CONFIG)
+
+        assert job_names == [
+            call_args[0][1] for call_args in lint_job_xml_mock.call_args_list]
+        assert [name.replace(' ', '_') for name in job_names] == [
+            call_args[0][2].getroot().tag
+            for call_args in lint_job_xml_mock.call_args_list]
+
+    def test_cache_used_when_configured(self, capsys, jenkins_mock, mocker,
+                                        tmpdir):
+        jenkins_mock.return_value.get_jobs.return_value = JENKINS_JOBS
+        jenkins_mock.return_value.get_job_config.side_effect = (
+            lambda name: "<?xml version='1.1' encoding='UTF-8'?>"
+                         "<project><name>{}</name></project>".format(name))
+        config = configparser.ConfigParser()
+        config.read_dict({'job_linter': {
+            'cache_file': str(tmpdir.join('cache.json'))}})
+        lint_job_xml_mock = mocker.patch('jenkins_job_linter.lint_job_xml')
+        lint_job_xml_mock.side_effect = (
+            lambda ctx, job_name, tree, config, **kwargs: print(
+                tree.find('name').text) or True)
+
+        lint_jobs_from_running_jenkins('url', 'user', 'pass', config)
+        assert 'a job\nanother job\n' == capsys.readouterr().out
+        assert 2 == lint_job_xml_mock.call_count
+        lint_jobs_from_running_jenkins('url', 'user', 'pass', config)
+        assert 'a job\nanother job\n' == capsys.readouterr().out
+        assert 2 == lint_job_xml_mock.call_count
+
+    def test_job_configs_fetched_with_bounded_threads(self, jenkins_mock,
+                                                      mocker):
+        executor_mock = mocker.patch(
+            'jenkins_job_linter.ThreadPoolExecutor', wraps=ThreadPoolExecutor)
+        lint_jobs_from_running_jenkins('url', 'user', 'pass', EMPTY_CONFIG)
+        assert mocker.call(
+            max_workers=JENKINS_FETCH_WORKERS) == executor_mock.call_args
+
+    def test_cache_misses_linted_in_process(self, jenkins_mock, mocker,
+                                            tmpdir):
+        jenkins_mock.return_value.get_jobs.return_value = JENKINS_JOBS
+        jenkins_mock.return_value.get_job_config.return_value = '<job />'
+        executor_mock = mocker.patch('jenkins_job_linter.ProcessPoolExecutor')
+        lint_job_xml_mock = mocker.patch('jenkins_job_linter.lint_job_xml',
+                                         return_value=True)
+        config = configparser.ConfigParser()
+        config.read_dict({'job_linter': {
+            'cache_file': str(tmpdir.join('cache.json')), 'processes': 2}})
+        assert lint_jobs_from_running_jenkins('url', 'user', 'pass', config)
+        assert 0 == executor_mock.call_count
+        assert 2 == lint_job_xml_mock.call_count
+
+    def test_returned_job_list_used_as_object_list(self, jenkins_mock,
+                                                   mocker):
+        jenkins_mock.return_value.get_jobs.return_value = JENKINS_JOBS
         mocker.patch('jenkins_job_linter.ElementTree')
         lint_job_xml_mock = mocker.patch('jenkins_job_linter.lint_job_xml')
 
         lint_jobs_from_running_jenkins(
-            'url', 'username', 'password', mocker.MagicMock())
+            'url', 'username', 'password', EMPTY_CONFIG)
 
         passed_ctx = lint_job_xml_mock.call_args[0][0]
-        assert job_names == passed_ctx.object_names
+        assert set(JENKINS_JOB_NAMES) == passed_ctx.object_names
 
 
 class TestLintDirectory:
 
-    def test_argument_passed_through(self, mocker):
-        runner = CliRunner()
-        dirname = 'some_dir'
+    def test_argument_passed_through(self, mocker, tmpdir):
+        dirname = str(tmpdir.mkdir('some_dir'))
         lint_jobs_mock = mocker.patch(
             'jenkins_job_linter.lint_jobs_from_directory')
 
-        with runner.isolated_filesystem():
-            os.mkdir(dirname)
-            runner.invoke(main, ['lint-directory', dirname])
+        RUNNER.invoke(main, ['lint-directory', dirname])
 
         assert 1 == lint_jobs_mock.call_count
         assert mocker.call(dirname, mocker.ANY) == lint_jobs_mock.call_args
 
-    def test_config_parsed_and_passed(self, mocker):
-        runner = CliRunner()
+    def test_config_parsed_and_passed(self, config_ini, mocker, tmpdir):
         lint_jobs_mock = mocker.patch(
             'jenkins_job_linter.lint_jobs_from_directory')
-        dirname = 'dirname'
-        config = '[job_linter]\nkey=value'
-        with runner.isolated_filesystem():
-            os.mkdir(dirname)
-            with open('config.ini', 'w') as config_ini:
-                config_ini.write(config)
-            runner.invoke(
-                main, ['--conf', 'config.ini', 'lint-directory', dirname])
+        dirname = str(tmpdir.mkdir('dirname'))
+        RUNNER.invoke(main, ['--conf', config_ini, 'lint-directory', dirname])
 
         assert 1 == lint_jobs_mock.call_count
         config = lint_jobs_mock.call_args[0][1]
@@ -345,54 +666,58 @@ class TestLintDirectory:
 
     @pytest.mark.parametrize('return_value,exit_code', ((False, 1), (True, 0)))
     def test_exit_code(self, mocker, exit_code, return_value):
-        runner = CliRunner()
         lint_jobs_mock = mocker.patch(
             'jenkins_job_linter.lint_jobs_from_directory')
         lint_jobs_mock.return_value = return_value
-        dirname = 'some_dir'
-        with runner.isolated_filesystem():
-            os.mkdir(dirname)
-            result = runner.invoke(main, ['lint-directory', dirname])
-        assert exit_code == result.exit_code
+        assert exit_code == _invoke_for_exit_code(
+            main.commands['lint-directory'], compiled_job_directory='dir')
 
-    @pytest.mark.parametrize('func', [
+    @pytest.mark.parametrize('path_func,readable', (
         # Non-existent directory
-        lambda dirname: None,
+        (lambda tmpdir: tmpdir.join('dirname'), True),
         # Directory is a file
-        lambda dirname: open(dirname, 'a').close(),
-        # Directory isn't readable ("or" because os.mkdir returns None)
-        lambda dirname: os.mkdir(dirname) or os.chmod(dirname, 0o000),
-    ])
-    def test_bad_directory_input(self, func, mocker):
-        runner = CliRunner()
-        lint_jobs_mock = mocker.patch(
-            'jenkins_job_linter.lint_jobs_from_directory')
-        dirname = 'dirname'
-        with runner.isolated_filesystem():
-            func(dirname)
-            result = runner.invoke(main, ['lint-directory', dirname])
-        assert result.exit_code != 0
-        assert lint_jobs_mock.call_count == 0
+        (lambda tmpdir: tmpdir.ensure('dirname'), True),
+        # Directory isn't readable
+        (lambda tmpdir: tmpdir.mkdir('dirname'), False),
+    ))
+    def test_bad_directory_input(self, path_func, readable, tmpdir):
+        with pytest.raises(click.BadParameter):
+            _convert_path_param(main.commands['lint-directory'],
+                                'compiled_job_directory', path_func(tmpdir),
+                                readable)
 
-    @pytest.mark.parametrize('func', [
+    @pytest.mark.parametrize('path_func,readable', (
         # Non-existent conf file
-        lambda conf: None,
+        (lambda tmpdir: tmpdir.join('conf.ini'), True),
         # Conf file is a directory
-        lambda conf: os.mkdir(conf),
-        # File isn't readable ("or" because .close() returns None)
-        lambda conf: open(conf, 'a').close() or os.chmod(conf, 0o000),
-    ])
-    def test_bad_config_input(self, func, mocker):
-        runner = CliRunner()
+        (lambda tmpdir: tmpdir.mkdir('conf.ini'), True),
+        # File isn't readable
+        (lambda tmpdir: tmpdir.ensure('conf.ini'), False),
+    ))
+    def test_bad_config_input(self, path_func, readable, tmpdir):
+        with pytest.raises(click.BadParameter):
+            _convert_path_param(main, 'conf', path_func(tmpdir), readable)
+
+    def test_good_directory_input(self, tmpdir):
+        dirname = str(tmpdir.mkdir('dirname'))
+        assert dirname == _convert_path_param(
+            main.commands['lint-directory'], 'compiled_job_directory',
+            dirname)
+
+    def test_invalid_processes_reported(self, tmpdir):
+        config_ini = tmpdir.join('config.ini')
+        config_ini.write('[job_linter]\nprocesses = -1\n')
+        result = RUNNER.invoke(main, ['--conf', str(config_ini),
+                                      'lint-directory', str(tmpdir)])
+        assert 1 == result.exit_code
+        assert ("Error: job_linter.processes must be a non-negative integer,"
+                " not '-1'") in result.output
+
+    def test_bad_input_not_linted(self, mocker, tmpdir):
         lint_jobs_mock = mocker.patch(
             'jenkins_job_linter.lint_jobs_from_directory')
-        dirname = 'dirname'
-        conf = 'conf.ini'
-        with runner.isolated_filesystem():
-            os.mkdir(dirname)
-            func(conf)
-            result = runner.invoke(
-                main, ['--conf', conf, 'lint-directory', dirname])
+        result = RUNNER.invoke(
+            main, ['lint-directory', str(tmpdir.join('dirname'))])
         assert result.exit_code != 0
         assert lint_jobs_mock.call_count == 0
 
@@ -400,36 +725,29 @@ class TestLintDirectory:
 class TestLintJenkins:
 
     def test_arguments_passed_through(self, mocker):
-        runner = CliRunner()
         lint_jobs_mock = mocker.patch(
             'jenkins_job_linter.lint_jobs_from_running_jenkins')
 
         url, username, password = 'url', 'username', 'password'
 
-        with runner.isolated_filesystem():
-            runner.invoke(main, ['lint-jenkins',
-                                 '--jenkins-url', url,
-                                 '--jenkins-username', username,
-                                 '--jenkins-password', password])
+        RUNNER.invoke(main, ['lint-jenkins',
+                             '--jenkins-url', url,
+                             '--jenkins-username', username,
+                             '--jenkins-password', password])
 
         assert 1 == lint_jobs_mock.call_count
         assert mocker.call(
             url, username, password, mocker.ANY) == lint_jobs_mock.call_args
 
-    def test_config_parsed_and_passed(self, mocker):
-        runner = CliRunner()
+    def test_config_parsed_and_passed(self, config_ini, mocker):
         lint_jobs_mock = mocker.patch(
             'jenkins_job_linter.lint_jobs_from_running_jenkins')
 
-        config = '[job_linter]\nkey=value'
-        with runner.isolated_filesystem():
-            with open('config.ini', 'w') as config_ini:
-                config_ini.write(config)
-            runner.invoke(
-                main, ['--conf', 'config.ini', 'lint-jenkins',
-                       '--jenkins-url', 'url',
-                       '--jenkins-username', 'username',
-                       '--jenkins-password', 'password'])
+        RUNNER.invoke(
+            main, ['--conf', config_ini, 'lint-jenkins',
+                   '--jenkins-url', 'url',
+                   '--jenkins-username', 'username',
+                   '--jenkins-password', 'password'])
 
         assert 1 == lint_jobs_mock.call_count
         config = lint_jobs_mock.call_args[0][-1]
@@ -437,36 +755,20 @@ class TestLintJenkins:
 
     @pytest.mark.parametrize('return_value,exit_code', ((False, 1), (True, 0)))
     def test_exit_code(self, mocker, exit_code, return_value):
-        runner = CliRunner()
         lint_jobs_mock = mocker.patch(
             'jenkins_job_linter.lint_jobs_from_running_jenkins')
         lint_jobs_mock.return_value = return_value
-        with runner.isolated_filesystem():
-            result = runner.invoke(main, ['lint-jenkins',
-                                          '--jenkins-url', 'url',
-                                          '--jenkins-username', 'username',
-                                          '--jenkins-password', 'password'])
-        assert exit_code == result.exit_code
-
-    @pytest.mark.parametrize('func', [
-        # Non-existent conf file
-        lambda conf: None,
-        # Conf file is a directory
-        lambda conf: os.mkdir(conf),
-        # File isn't readable ("or" because .close() returns None)
-        lambda conf: open(conf, 'a').close() or os.chmod(conf, 0o000),
-    ])
-    def test_bad_config_input(self, func, mocker):
-        runner = CliRunner()
+        assert exit_code == _invoke_for_exit_code(
+            main.commands['lint-jenkins'], jenkins_url='url',
+            jenkins_username='username', jenkins_password='password')
+
+    def test_bad_config_input_not_linted(self, mocker, tmpdir):
         lint_jobs_mock = mocker.patch(
             'jenkins_job_linter.lint_jobs_from_running_jenkins')
-        conf = 'conf.ini'
-        with runner.isolated_filesystem():
-            func(conf)
-            result = runner.invoke(
-                main, ['--conf', conf, 'lint-jenkins',
-                       '--jenkins-url', 'url',
-                       '--jenkins-username', 'username',
-                       '--jenkins-password', 'password'])
+        result = RUNNER.invoke(
+            main, ['--conf', str(tmpdir.join('conf.ini')), 'lint-jenkins',
+                   '--jenkins-url', 'url',
+                   '--jenkins-username', 'username',
+                   '--jenkins-password', 'password'])
         assert result.exit_code != 0
         assert lint_jobs_mock.call_count == 0
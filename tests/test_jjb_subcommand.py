@@ -11,6 +11,8 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import configparser
+
 import pytest
 
 from jenkins_job_linter.jjb_subcommand import LintSubCommand
@@ -118,3 +120,17 @@ class TestExecute:
         with pytest.raises(SystemExit) as exc_info:
             subcommand.execute(mocker.Mock, jjb_config)
         assert expected == exc_info.value.code
+
+    def test_config_error_reported(self, capsys, mocker, tmpdir):
+        mocker.patch(
+            'jenkins_job_linter.jjb_subcommand.test.TestSubCommand.execute')
+        jjb_config = mocker.Mock()
+        jjb_config.config_parser = configparser.ConfigParser()
+        jjb_config.config_parser.read_dict(
+            {'job_linter': {'processes': '-1'}})
+        subcommand = LintSubCommand()
+        with pytest.raises(SystemExit) as exc_info:
+            subcommand.execute(mocker.Mock(), jjb_config)
+        assert 1 == exc_info.value.code
+        assert ("ERROR: job_linter.processes must be a non-negative integer,"
+                " not '-1'\n") == capsys.readouterr().err
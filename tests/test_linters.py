@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import configparser
+import functools
 import itertools
 from xml.etree import ElementTree
 
@@ -32,10 +33,15 @@ from jenkins_job_linter.models import LintContext, RunContext
 
 from .mocks import get_config
 
-FAILING_SHEBANG_ARGS = ['e', 'u', 'x'] + list(itertools.combinations('eux', 2))
-PASSING_SHEBANG_ARGS = itertools.permutations('eux')
+FAILING_SHEBANG_ARGS = tuple(
+    ''.join(args) for length in (1, 2)
+    for args in itertools.combinations('eux', length))
+PASSING_SHEBANG_ARGS = tuple(
+    ''.join(args) for args in itertools.permutations('eux'))
 
 
+# Linters only read the tree, so tests given the same XML can share a parse
+@functools.lru_cache(maxsize=None)
 def _elementtree_from_str(xml_string: str) -> ElementTree.ElementTree:
     return ElementTree.ElementTree(ElementTree.fromstring(xml_string))
 
@@ -70,9 +76,9 @@ class TestCheckShebang(ShellTest):
         (LintResult.FAIL, '#!/bin/zsh'),
         (LintResult.PASS, '#!/usr/bin/env python'),
         (LintResult.PASS, ''),
-    ] + [(LintResult.FAIL, '#!/bin/sh -{}'.format(''.join(args)))
+    ] + [(LintResult.FAIL, '#!/bin/sh -{}'.format(args))
          for args in FAILING_SHEBANG_ARGS] +
-        [(LintResult.PASS, '#!/bin/sh -{}'.format(''.join(args)))
+        [(LintResult.PASS, '#!/bin/sh -{}'.format(args))
          for args in PASSING_SHEBANG_ARGS]
     )
     def test_project_with_shell(self, expected, shell_string):
@@ -156,6 +162,33 @@ class TestCheckForEmptyShell(ShellTest):
         result, _ = linter.check()
         assert result is expected
 
+    def test_stops_at_first_failure(self, mocker):
+        tree = _elementtree_from_str(self._xml_template.format(
+            builders=self._shell_builder_template.format(shell_script='')
+            * 2))
+        shell_check_spy = mocker.spy(CheckForEmptyShell, 'shell_check')
+        linter = CheckForEmptyShell(LintContext({}, None, tree))
+        result, _ = linter.check()
+        assert result is LintResult.FAIL
+        assert 1 == shell_check_spy.call_count
+
+    def test_only_builder_shell_commands_checked(self):
+        tree = _elementtree_from_str(self._xml_template.format(builders='''\
+            <hudson.tasks.BatchFile><command/></hudson.tasks.BatchFile>
+            <wrapper>
+                <hudson.tasks.Shell><command/></hudson.tasks.Shell>
+            </wrapper>
+            <hudson.tasks.Shell><notcommand/></hudson.tasks.Shell>
+        ''').replace('</project>', '''\
+            <publishers>
+                <hudson.tasks.Shell><command/></hudson.tasks.Shell>
+            </publishers>
+        </project>'''))
+        linter = CheckForEmptyShell(LintContext({}, None, tree))
+        result, text = linter.check()
+        assert result is LintResult.SKIP
+        assert text is None
+
 
 class TestEnsureTimestamps:
 
@@ -319,6 +352,16 @@ class TestCheckEnvInject:
         result, _ = linter.check()
         assert result is expected
 
+    def test_empty_properties_reported(self):
+        tree = _elementtree_from_str(self._template.format(''))
+        config = get_config()
+        config['job_linter:check_env_inject'][
+            'required_environment_settings'] = 'SOME=thing'
+        linter = CheckEnvInject(
+            LintContext(config['job_linter:check_env_inject'], None, tree))
+        assert (LintResult.FAIL, 'Injected properties empty') == (
+            linter.check())
+
 
 class TestLinter:
 
@@ -330,9 +373,9 @@ class TestLinter:
         def actual_check(self):
             return self._ctx.config['_mock_result']
 
-    def test_check_and_text_passed_through(self, mocker):
+    def test_check_and_text_passed_through(self):
         tree = _elementtree_from_str('<test_tag/>')
-        mock_result = mocker.sentinel.result, mocker.sentinel.text
+        mock_result = object(), object()
         linter = self.LintTestSubclass(
             LintContext({'_mock_result': mock_result}, None, tree))
         assert mock_result == linter.check()